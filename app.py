@@ -1,28 +1,140 @@
+import asyncio
 import base64
+import hashlib
 import io
-import requests
+import aiohttp
 import zipfile
+from collections import OrderedDict
 import csv
 import os
+import pickle
+import secrets
+import numpy as np
+import orjson
 from dotenv import load_dotenv
+import diskcache
+from flask import abort, send_file
+from flask_compress import Compress
 
-from PIL import Image, ImageDraw
+import cv2
+import numba
+from PIL import Image, UnidentifiedImageError
 
 import dash
 import dash_bootstrap_components as dbc
+import plotly.io as pio
 from dash import dash_table
 from dash import dcc, html, Input, Output, State
+from dash import CeleryManager, DiskcacheManager
 
 
+VISIONAGENT_URL = "https://api.va.landing.ai/v1/tools/agentic-object-detection"
+API_TIMEOUT = aiohttp.ClientTimeout(total=60)
+# Failures to connect are retried with exponential backoff. Nothing else is:
+# the POST is billable and not idempotent, so a disconnect or timeout may come
+# after VisionAgent has already done the work
+API_RETRIES = 2
+API_BACKOFF = 0.2  # seconds
+
+# Read the .env file once at import rather than on every page load
+load_dotenv()
+_API_KEY = os.getenv("VISIONAGENT_API_KEY")
+
+
+class RedisCache:
+    """
+    The subset of the diskcache.Cache API used below (get, set with expire), stored
+    in Redis under a key prefix so web and Celery worker hosts see the same entries.
+    """
+
+    def __init__(self, client, prefix):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key, default=None):
+        value = self.client.get(self.prefix + key)
+        return default if value is None else pickle.loads(value)
+
+    def set(self, key, value, expire=None):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=expire)
+
+
+DETECTION_CACHE_TTL = 3600  # seconds
+UPLOAD_CACHE_TTL = 3600  # seconds
+RESULT_CACHE_TTL = 3600  # seconds
+
+# Background callback manager and the caches shared between the web process and
+# the detection workers:
+# - detection_cache: VisionAgent responses keyed by image hash, API key and prompt
+# - upload_cache: decoded uploads keyed by the token in the "image-bytes-token" store
+# - result_cache: {"img": annotated WebP, "table": table rows} keyed by the token in
+#   detection_store; served from /annotated/<token> and download_results
+# With REDIS_URL set, detections run on Celery workers, possibly on other hosts, so
+# the caches live in Redis. Otherwise a local diskcache-backed process pool is used
+# for development and the caches are diskcache directories on this host.
+if "REDIS_URL" in os.environ:
+    import redis
+    from celery import Celery
+
+    celery_app = Celery(
+        __name__, broker=os.environ["REDIS_URL"], backend=os.environ["REDIS_URL"]
+    )
+    background_callback_manager = CeleryManager(celery_app)
+
+    redis_client = redis.Redis.from_url(os.environ["REDIS_URL"])
+    detection_cache = RedisCache(redis_client, "agentvision:detections:")
+    upload_cache = RedisCache(redis_client, "agentvision:uploads:")
+    result_cache = RedisCache(redis_client, "agentvision:results:")
+else:
+    background_callback_manager = DiskcacheManager(diskcache.Cache("./cache"))
+
+    detection_cache = diskcache.Cache("./cache/detections")
+    upload_cache = diskcache.Cache(
+        "./cache/uploads",
+        size_limit=2**29,
+        eviction_policy="least-recently-used",
+    )
+    result_cache = diskcache.Cache("./cache/results")
+
+# Label text style for cv2.putText; Hershey fonts are built in, so nothing is loaded
+LABEL_FONT = cv2.FONT_HERSHEY_SIMPLEX
+LABEL_FONT_SCALE = 0.5
+
+# Decoded annotation previews keyed by hash_image() digest, least recently used first
+decoded_images = OrderedDict()
+DECODED_IMAGES_MAX = 4
+
+# Uploads are downscaled to this before being sent to VisionAgent
+MAX_UPLOAD_SIZE = (1920, 1920)
+# Upload formats kept as-is; anything else is normalised to JPEG
+PASSTHROUGH_FORMATS = {"JPEG", "PNG", "WEBP"}
+
+# Annotated previews are shown at maxWidth 100%, so larger images are wasted bytes
+MAX_ANNOTATED_SIZE = (1600, 1600)
+
 # Initialize Dash with a Bootstrap theme
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+app = dash.Dash(
+    __name__,
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    background_callback_manager=background_callback_manager,
+)
+
+# Dash serializes callback responses through plotly's JSON helper; pin it to orjson
+pio.json.config.default_engine = "orjson"
+
+# Compress callback JSON responses; the annotated image is served separately
+app.server.config["COMPRESS_ALGORITHM"] = ["br", "gzip"]
+app.server.config["COMPRESS_MIN_SIZE"] = 1024
+Compress(app.server)
 
 # Layout
 app.layout = dbc.Container(
     [
         # Hidden store for API key
         dcc.Store(id="api_key", storage_type="session"),
-        # Hidden store for detection results
+        # Hidden store for the server-side token of the decoded upload
+        dcc.Store(id="image-bytes-token", storage_type="memory"),
+        # Hidden store for the server-side token of the detection results
         dcc.Store(id="detection_store", storage_type="memory"),
         # A hidden element to trigger loading the key on startup
         html.Div("", id="load-api-key-div", style={"display": "none"}),
@@ -183,60 +295,213 @@ app.layout = dbc.Container(
 )
 
 
-def call_agentic_object_detection_api(image_bytes, prompt, api_key):
+def hash_image(image_bytes):
+    """
+    Content hash used to key the detection and decode caches.
+    """
+    return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+
+async def call_agentic_object_detection_api(session, image_bytes, prompt, api_key):
     """
     Calls the VisionAgent / Agentic Object Detection API for a single object (prompt).
     VisionAgent documentation say: "Only one object type can be detected at a time."
     """
-    url = "https://api.va.landing.ai/v1/tools/agentic-object-detection"
-    files = {"image": ("uploaded_image.jpg", image_bytes, "image/jpeg")}
-    data = {"prompts": prompt, "model": "agentic"}
     headers = {"Authorization": f"Basic {api_key}"}
-    response = requests.post(url, files=files, data=data, headers=headers)
-    response.raise_for_status()
-    return response.json()
+    for attempt in range(API_RETRIES + 1):
+        # FormData can only be sent once, so it is rebuilt for every attempt
+        form = aiohttp.FormData()
+        form.add_field(
+            "image",
+            image_bytes,
+            filename="uploaded_image.jpg",
+            content_type="image/jpeg",
+        )
+        form.add_field("prompts", prompt)
+        form.add_field("model", "agentic")
+        try:
+            async with session.post(
+                VISIONAGENT_URL, data=form, headers=headers
+            ) as response:
+                response.raise_for_status()
+                return orjson.loads(await response.read())
+        except aiohttp.ClientConnectorError:
+            if attempt == API_RETRIES:
+                raise
+            await asyncio.sleep(API_BACKOFF * 2**attempt)
+
+
+async def cached_object_detection(session, image_bytes, image_hash, prompt, api_key):
+    """
+    Returns the VisionAgent response for (image, prompt), calling the API on a miss.
+    image_hash is the hash_image() digest of image_bytes.
+    """
+    api_key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    key = f"{image_hash.hex()}:{api_key_hash}:{prompt}"
+    res = detection_cache.get(key)
+    if res is None:
+        res = await call_agentic_object_detection_api(
+            session, image_bytes, prompt, api_key
+        )
+        detection_cache.set(key, res, expire=DETECTION_CACHE_TTL)
+    return res
 
 
-def draw_bounding_boxes(decoded_image, detections, prompt_colors):
+async def batch_detect(image_bytes, image_hash, prompts_list, api_key, max_workers=10):
     """
-    Draws bounding boxes on the image with colors based on the prompt and score.
-    Score=1 → base prompt color; score=0 → black; gradient in between.
+    Runs one detection per prompt concurrently over a shared aiohttp session,
+    with at most max_workers requests in flight.
+    Returns one result per prompt, in order; failures are returned as exceptions.
     """
-    # Convert to RGB to avoid RGBA→JPEG errors
-    image = Image.open(io.BytesIO(decoded_image)).convert("RGB")
-    draw = ImageDraw.Draw(image)
+    sem = asyncio.Semaphore(max_workers)
 
-    for det in detections:
-        label = det.get("label", "N/A")
-        score = det.get("score", 0.0)
-        box = det.get("bounding_box", [])
-        if len(box) != 4:
-            continue
+    async def detect(session, prompt):
+        async with sem:
+            return await cached_object_detection(
+                session, image_bytes, image_hash, prompt, api_key
+            )
 
-        xmin, ymin, xmax, ymax = box
-        base_color = prompt_colors.get(label, (0, 0, 0))
-        # interpolate toward black
-        r = int(base_color[0] * score)
-        g = int(base_color[1] * score)
-        b = int(base_color[2] * score)
-        color = (r, g, b)
+    async with aiohttp.ClientSession(timeout=API_TIMEOUT) as session:
+        tasks = [asyncio.create_task(detect(session, p)) for p in prompts_list]
+        return await asyncio.gather(*tasks, return_exceptions=True)
 
-        draw.rectangle([xmin, ymin, xmax, ymax], outline=color, width=3)
-        draw.text((xmin + 2, ymin - 15), f"{label} ({score:.2f})", fill=color)
 
+def downscale_image(image_bytes):
+    """
+    Shrinks images larger than MAX_UPLOAD_SIZE and re-encodes them as JPEG.
+    Formats OpenCV may not decode (GIF, ICO, PSD, ...) are always re-encoded.
+    Other images are returned unchanged; detections use the downscaled frame.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    if (
+        image.format in PASSTHROUGH_FORMATS
+        and max(image.size) <= max(MAX_UPLOAD_SIZE)
+    ):
+        return image_bytes
+    image.thumbnail(MAX_UPLOAD_SIZE, Image.LANCZOS)
     output_buffer = io.BytesIO()
-    image.save(output_buffer, format="JPEG")
+    image.convert("RGB").save(output_buffer, format="JPEG", quality=85)
     return output_buffer.getvalue()
 
 
+@numba.njit(cache=True)
+def prep_boxes(boxes, scores, bases, width, height):
+    """
+    Scales each base color by its score and clips box corners to the image bounds.
+    Returns (N, 3) uint8 colors and (N, 4) int boxes.
+    """
+    n = boxes.shape[0]
+    out_col = np.empty((n, 3), np.uint8)
+    out_box = np.empty((n, 4), np.int64)
+    for i in range(n):
+        for c in range(3):
+            out_col[i, c] = min(255, int(bases[i, c] * scores[i]))
+        out_box[i, 0] = max(0, min(width - 1, int(boxes[i, 0])))
+        out_box[i, 1] = max(0, min(height - 1, int(boxes[i, 1])))
+        out_box[i, 2] = max(0, min(width - 1, int(boxes[i, 2])))
+        out_box[i, 3] = max(0, min(height - 1, int(boxes[i, 3])))
+    return out_col, out_box
+
+
+@numba.njit(cache=True)
+def draw_box_edges(img, boxes, colors):
+    """
+    Rasterizes 3px box outlines into img in place, in order, so later boxes
+    overwrite earlier ones where they overlap.
+    """
+    for i in range(boxes.shape[0]):
+        xmin, ymin, xmax, ymax = boxes[i, 0], boxes[i, 1], boxes[i, 2], boxes[i, 3]
+        for c in range(3):
+            # top, bottom, left, right
+            img[ymin : ymin + 3, xmin : xmax + 1, c] = colors[i, c]
+            img[max(ymax - 2, 0) : ymax + 1, xmin : xmax + 1, c] = colors[i, c]
+            img[ymin : ymax + 1, xmin : xmin + 3, c] = colors[i, c]
+            img[ymin : ymax + 1, max(xmax - 2, 0) : xmax + 1, c] = colors[i, c]
+
+
+def decode_image(image_hash, image_bytes):
+    """
+    Decodes an image to a read-only BGR array shrunk to fit MAX_ANNOTATED_SIZE.
+    Returns (array, scale). Memoized on image_hash alone (the bytes are only
+    decoded on a miss), so redraws of the same upload skip the decode.
+    """
+    cached = decoded_images.get(image_hash)
+    if cached is not None:
+        decoded_images.move_to_end(image_hash)
+        return cached
+
+    # IMREAD_COLOR drops any alpha channel, so the result is always 3-channel BGR;
+    # EXIF orientation is ignored so pixels match the API's box coordinates
+    arr = cv2.imdecode(
+        np.frombuffer(image_bytes, np.uint8),
+        cv2.IMREAD_COLOR | cv2.IMREAD_IGNORE_ORIENTATION,
+    )
+    if arr is None:
+        raise ValueError("Could not decode the uploaded image.")
+    height, width = arr.shape[:2]
+    scale = min(1.0, MAX_ANNOTATED_SIZE[0] / width, MAX_ANNOTATED_SIZE[1] / height)
+    if scale < 1.0:
+        size = (round(width * scale), round(height * scale))
+        arr = cv2.resize(arr, size, interpolation=cv2.INTER_LINEAR)
+    arr.flags.writeable = False
+    decoded_images[image_hash] = (arr, scale)
+    if len(decoded_images) > DECODED_IMAGES_MAX:
+        decoded_images.popitem(last=False)
+    return arr, scale
+
+
+def draw_bounding_boxes(decoded_image, labels, scores, boxes, base_colors, image_hash):
+    """
+    Draws bounding boxes on the image with colors based on the prompt and score.
+    Score=1 → base prompt color; score=0 → black; gradient in between.
+    Takes non-empty per-detection columns already filtered to 4-value boxes, in
+    draw order; detect_objects returns early when nothing is left to draw.
+    Box edges are rasterized by draw_box_edges; OpenCV decodes, labels and encodes.
+    """
+    decoded, scale = decode_image(image_hash, decoded_image)
+    arr = decoded.copy()
+    height, width = arr.shape[:2]
+
+    boxes = np.array(boxes, dtype=np.float64) * scale
+    # interpolate toward black, then RGB→BGR for OpenCV
+    colors, clipped = prep_boxes(boxes, scores, base_colors, width, height)
+    colors = np.ascontiguousarray(colors[:, ::-1])
+    draw_box_edges(arr, clipped, colors)
+
+    texts = [f"{label} ({score:.2f})" for label, score in zip(labels, scores)]
+    for text, color, (xmin, ymin, _, _) in zip(texts, colors, clipped):
+        cv2.putText(
+            arr,
+            text,
+            (int(xmin) + 2, int(ymin) - 5),
+            LABEL_FONT,
+            LABEL_FONT_SCALE,
+            color.tolist(),
+            1,
+            cv2.LINE_AA,
+        )
+
+    # WebP is ~30% smaller than JPEG at similar quality and supported by all browsers
+    ok, encoded = cv2.imencode(".webp", arr, [cv2.IMWRITE_WEBP_QUALITY, 80])
+    if not ok:
+        raise ValueError("Could not encode the annotated image.")
+    return encoded.tobytes()
+
+
+@app.server.route("/annotated/<token>")
+def serve_annotated_image(token):
+    result = result_cache.get(token)
+    if result is None:
+        abort(404)
+    return send_file(io.BytesIO(result["img"]), mimetype="image/webp")
+
+
 @app.callback(
     Output("api_key", "data"),
     Input("load-api-key-div", "children"),
 )
 def store_api_key(_):
-    load_dotenv()
-    api_key = os.getenv("VISIONAGENT_API_KEY")
-    return api_key
+    return _API_KEY
 
 
 @app.callback(
@@ -244,21 +509,38 @@ def store_api_key(_):
     Output("detection-results", "children"),
     Output("annotated-image-container", "children"),
     Output("detection_store", "data"),
+    Output("image-bytes-token", "data"),
     Input("upload-image", "contents"),
 )
 def display_uploaded_image(contents):
     if contents is not None:
+        # Decode once; detect_objects looks the bytes up by token
+        _, content_string = contents.split(",")
+        try:
+            image_bytes = downscale_image(base64.b64decode(content_string))
+        except (UnidentifiedImageError, OSError):
+            return (
+                html.Div("Unsupported image. Please upload a JPEG or PNG file."),
+                "",
+                None,
+                None,
+                None,  # clear the token so Detect can't reuse a previous upload
+            )
+        token = secrets.token_urlsafe(16)
+        upload_cache.set(token, image_bytes, expire=UPLOAD_CACHE_TTL)
         return (
             html.Img(src=contents, style={"maxWidth": "100%", "height": "auto"}),
             "",  # clear detection results
             None,  # clear annotated image
             None,  # clear detection store
+            token,
         )
     return (
         html.Div("No image uploaded yet."),
         "",
         html.Div("No image uploaded yet."),
         None,
+        None,
     )
 
 
@@ -267,13 +549,16 @@ def display_uploaded_image(contents):
     Output("annotated-image-container", "children", allow_duplicate=True),
     Output("detection_store", "data", allow_duplicate=True),
     Input("detect-button", "n_clicks"),
-    State("upload-image", "contents"),
+    State("image-bytes-token", "data"),
     State("input-prompts", "value"),
     State("api_key", "data"),
     prevent_initial_call=True,
+    # Run the VisionAgent calls off the web worker
+    background=True,
+    running=[(Output("detect-button", "disabled"), True, False)],
 )
-def detect_objects(n_clicks, uploaded_image_contents, prompt_text, api_key):
-    if not uploaded_image_contents:
+def detect_objects(n_clicks, image_token, prompt_text, api_key):
+    if not image_token:
         return ("No image uploaded yet.", None, None)
     if not prompt_text:
         return ("Please enter at least one prompt.", None, None)
@@ -285,62 +570,106 @@ def detect_objects(n_clicks, uploaded_image_contents, prompt_text, api_key):
         )
 
     raw_prompts = [p.strip() for p in prompt_text.split(",") if p.strip()]
-    prompts_list = raw_prompts[:3]
+    # Repeated prompts would make identical API calls and share status entries
+    prompts_list = list(dict.fromkeys(raw_prompts))[:3]
     if not prompts_list:
         return ("No valid prompts found.", None, None)
 
-    # assign base colors: green, blue, red
+    # assign base colors: green, blue, red; the trailing black row (index -1)
+    # is used for labels that don't match a prompt
     base_palette = [(0, 255, 0), (0, 0, 255), (255, 0, 0)]
-    prompt_colors = {prompts_list[i]: base_palette[i] for i in range(len(prompts_list))}
+    palette = np.array(
+        base_palette[: len(prompts_list)] + [(0, 0, 0)], dtype=np.float32
+    )
+    label_to_idx = {p: i for i, p in enumerate(prompts_list)}
 
-    _, content_string = uploaded_image_contents.split(",")
-    decoded_image = base64.b64decode(content_string)
+    decoded_image = upload_cache.get(image_token)
+    if decoded_image is None:
+        return ("Uploaded image has expired. Please upload it again.", None, None)
 
     combined_detections = []
     status = [
         f"{len(prompts_list)} object type(s) prompted: {', '.join(prompts_list)}.\n"
     ]
 
-    for prompt in prompts_list:
-        try:
-            res = call_agentic_object_detection_api(decoded_image, prompt, api_key)
-        except Exception as e:
-            status.append(f"Failed detecting '{prompt}': {e}\n")
-            continue
-        if "data" in res and res["data"]:
+    # Hash once; shared by every prompt's cache lookup and the decode cache
+    image_hash = hash_image(decoded_image)
+    # One request per prompt, issued concurrently; results come back in prompt order
+    results = asyncio.run(
+        batch_detect(decoded_image, image_hash, prompts_list, api_key)
+    )
+
+    # Per-prompt status line, or the number of detections returned; found counts
+    # are reported after de-duplication below
+    outcomes = {}
+    for prompt, res in zip(prompts_list, results):
+        if isinstance(res, Exception):
+            # Some exceptions (e.g. timeouts) have an empty message
+            reason = str(res) or type(res).__name__
+            outcomes[prompt] = f"Failed detecting '{prompt}': {reason}\n"
+        elif "data" in res and res["data"]:
+            found = 0
             for grp in res["data"]:
                 detections = grp if isinstance(grp, list) else [grp]
-                status.append(f"Found {len(detections)} detection(s) for '{prompt}'\n")
-                combined_detections.extend(detections)
+                found += len(detections)
+                combined_detections.extend((prompt, det) for det in detections)
+            outcomes[prompt] = found
         else:
-            status.append(f"No detections returned for '{prompt}'\n")
-
-    if not combined_detections:
-        return ("".join(status) + "\nNo objects detected.", None, None)
+            outcomes[prompt] = f"No detections returned for '{prompt}'\n"
 
-    combined_detections.sort(key=lambda x: x.get("score", 0), reverse=True)
+    combined_detections.sort(key=lambda pd: pd[1].get("score", 0), reverse=True)
 
-    table_data = []
-    style_cond = []
-    for idx, det in enumerate(combined_detections):
+    # Drop near-duplicate boxes (same label, corners within 8px); the
+    # highest-scoring copy is kept since the list is already sorted. The same
+    # pass collects the columns shared by the results table and the drawing.
+    seen = set()
+    kept = dict.fromkeys(prompts_list, 0)
+    labels, scores, boxes, color_idx = [], [], [], []
+    for prompt, det in combined_detections:
+        box = det.get("bounding_box", [])
+        if len(box) != 4:
+            continue
         label = det.get("label", "N/A")
-        score = det.get("score", 0.0)
-        bbox = det.get("bounding_box", {})
-        table_data.append(
-            {
-                "Label": label,
-                "Score": f"{score:.2f}",
-                "Bounding Box": str(bbox),
-            }
-        )
-        base = prompt_colors.get(label, (0, 0, 0))
-        r, g, b = int(base[0] * score), int(base[1] * score), int(base[2] * score)
-        style_cond.append(
-            {
-                "if": {"row_index": idx, "column_id": "Label"},
-                "color": f"rgb({r},{g},{b})",
-            }
-        )
+        key = (label, *(int(c) >> 3 for c in box))
+        if key in seen:
+            continue
+        seen.add(key)
+        kept[prompt] += 1
+        labels.append(label)
+        scores.append(det.get("score", 0.0))
+        boxes.append(box)
+        color_idx.append(label_to_idx.get(label, -1))
+
+    for prompt, outcome in outcomes.items():
+        if isinstance(outcome, int):
+            line = f"Found {outcome} detection(s) for '{prompt}'"
+            if kept[prompt] != outcome:
+                line += f" ({kept[prompt]} after de-duplication)"
+            outcome = line + "\n"
+        status.append(outcome)
+
+    if not labels:
+        return ("".join(status) + "\nNo objects detected.", None, None)
+
+    scores = np.array(scores, dtype=np.float32)
+    base = palette[color_idx]
+    rgb = (base * scores[:, None]).astype(np.uint8)
+
+    table_data = [
+        {
+            "Label": label,
+            "Score": f"{score:.2f}",
+            "Bounding Box": str(box),
+        }
+        for label, score, box in zip(labels, scores, boxes)
+    ]
+    style_cond = [
+        {
+            "if": {"row_index": idx, "column_id": "Label"},
+            "color": f"rgb({r},{g},{b})",
+        }
+        for idx, (r, g, b) in enumerate(rgb.tolist())
+    ]
 
     detection_table = dash_table.DataTable(
         columns=[
@@ -354,12 +683,18 @@ def detect_objects(n_clicks, uploaded_image_contents, prompt_text, api_key):
         style_data_conditional=style_cond,
     )
 
-    annotated_bytes = draw_bounding_boxes(
-        decoded_image, combined_detections, prompt_colors
+    try:
+        annotated_bytes = draw_bounding_boxes(
+            decoded_image, labels, scores, boxes, base, image_hash
+        )
+    except ValueError as e:
+        return ("".join(status) + f"\nCould not annotate the image: {e}", None, None)
+    token = secrets.token_urlsafe(16)
+    result_cache.set(
+        token, {"img": annotated_bytes, "table": table_data}, expire=RESULT_CACHE_TTL
     )
-    annotated_b64 = base64.b64encode(annotated_bytes).decode("utf-8")
     annotated_img = html.Img(
-        src=f"data:image/jpeg;base64,{annotated_b64}",
+        src=f"/annotated/{token}",
         style={"maxWidth": "100%", "height": "auto", "border": "2px solid #ccc"},
     )
 
@@ -370,12 +705,7 @@ def detect_objects(n_clicks, uploaded_image_contents, prompt_text, api_key):
         ]
     )
 
-    store = {
-        "annotated_image": f"data:image/jpeg;base64,{annotated_b64}",
-        "detection_table": table_data,
-    }
-
-    return (results_div, annotated_img, store)
+    return (results_div, annotated_img, token)
 
 
 @app.callback(
@@ -400,12 +730,13 @@ def toggle_download(detect_data, clicks):
     State("detection_store", "data"),
     prevent_initial_call=True,
 )
-def download_results(n, data):
-    if not data:
+def download_results(n, token):
+    result = result_cache.get(token) if token else None
+    if not result:
         return dash.no_update
 
-    ann = data.get("annotated_image", "")
-    tbl = data.get("detection_table", [])
+    img_b = result["img"]
+    tbl = result["table"]
 
     # CSV
     buf = io.StringIO()
@@ -415,13 +746,15 @@ def download_results(n, data):
     csv_bytes = buf.getvalue().encode("utf-8")
 
     zip_buf = io.BytesIO()
-    with zipfile.ZipFile(zip_buf, "w") as zf:
-        if ann.startswith("data:image"):
-            img_b = base64.b64decode(ann.split(",")[1])
-        else:
-            img_b = b""
-        zf.writestr("annotated_image.jpg", img_b)
-        zf.writestr("results.csv", csv_bytes)
+    # The WebP is already compressed, so store it as-is; the CSV gets a fast deflate
+    with zipfile.ZipFile(zip_buf, "w", compression=zipfile.ZIP_STORED) as zf:
+        zf.writestr("annotated_image.webp", img_b)
+        zf.writestr(
+            "results.csv",
+            csv_bytes,
+            compress_type=zipfile.ZIP_DEFLATED,
+            compresslevel=1,
+        )
     zip_buf.seek(0)
     return dcc.send_bytes(zip_buf.getvalue(), "results.zip")
 
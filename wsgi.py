@@ -0,0 +1,23 @@
+"""
+WSGI entrypoint for production: gunicorn -k gevent -w 4 wsgi:application
+gevent's monkey-patching must run before anything else imports socket/ssl.
+"""
+from gevent import monkey
+
+monkey.patch_all()
+
+import os  # noqa: E402
+
+from dotenv import load_dotenv  # noqa: E402
+
+# Detections must run on Celery workers: the DiskcacheManager fallback would fork
+# asyncio/aiohttp jobs out of these gevent-patched processes
+load_dotenv()
+if "REDIS_URL" not in os.environ:
+    raise RuntimeError(
+        "REDIS_URL must be set to run under gunicorn; detections run on Celery workers."
+    )
+
+from app import app  # noqa: E402
+
+application = app.server